@@ -5,17 +5,19 @@ Rôle:
 - Il permet à l'utilisateur de saisir ses préférences de vol (ville de départ, destination, date, budget, etc.).
 - Il lance le scraping via le module flight_scraper.
 - Il applique un filtrage des résultats (budget, heure, escales).
-- Il appelle l'agent IA (flight_recommender) pour générer une réponse finale claire.
+- Il affiche directement le meilleur vol et, sur demande, appelle un modèle IA rapide
+  (flight_recommender) pour rédiger la réponse finale.
 """
 import streamlit as st # Interface utilisateur web 
 from datetime import date, datetime # Gestion des dates
 from flight_scraper import scrape_and_save # Fonction de scraping 
-from flight_recommender import agent # Agent IA qui analyse et formule la réponse
+from flight_recommender import describe_flight, warm_up_llm # Modèle IA qui formule la réponse
 import asyncio
 import sys
+import threading
+import pandas as pd
 import html
 import re
-import pandas as pd
 
 # Fix boucle asyncio sous Windows
 if sys.platform.startswith("win"):
@@ -29,6 +31,15 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+def show_message(placeholder, message: str):
+    """Affiche (ou remplace) le message de l'IA dans le bloc `placeholder`."""
+    message = html.unescape(message)
+    message = re.sub(r'\\[nrt]', '\n', message)
+    placeholder.markdown(
+        f"<pre style='white-space: pre-wrap; color: white; background-color: #1e1e1e; padding: 1rem;'>{message}</pre>",
+        unsafe_allow_html=True
+    )
+
 # Titre et description de l'application
 st.title("🛫 Assistant Vol IA – Recherche Automatique")
 st.markdown("💡 **Trouvez rapidement le meilleur vol sur Google Flights** grâce à notre assistant IA.")
@@ -72,6 +83,9 @@ with st.form("flight_form"):
             format="%d"
         )
 
+    # Option : rédaction de la réponse par l'IA (sinon, réponse générée directement)
+    explain = st.checkbox("🤖 Faire rédiger la réponse par l'IA", value=False)
+
     # Bouton de soumission du formulaire
     submitted = st.form_submit_button("🔍 Rechercher le vol idéal")
 
@@ -85,43 +99,69 @@ if submitted:
         # Formatage de la date en chaîne
         formatted_date = flight_date.strftime("%Y-%m-%d")
 
-        # Étape 1 : Scraping des vols avec flight_scraper
-        with st.spinner("🕷️ Scraping des vols..."):
-            scrape_and_save(departure_city, destination_city, formatted_date)
+        # Préchauffage de la connexion vers l'API du modèle, en parallèle du scraping
+        if explain:
+            threading.Thread(target=warm_up_llm, daemon=True).start()
 
+        # Étape 1 : Scraping des vols avec flight_scraper
+        # (une recherche identique récente est servie par le cache du scraper)
         try:
-            # Étape 2 : Lecture des données de vol extraites
-            df = pd.read_csv("flight_data.csv")
+            with st.spinner("🕷️ Scraping des vols..."):
+                flights_df = scrape_and_save(departure_city, destination_city, formatted_date)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        except TimeoutError:
+            st.error("❌ Le scraping n'a pas abouti (Google Flights n'a pas répondu à temps). Merci de réessayer.")
+            st.stop()
 
-            # Nettoyage prix → float
-            df['Price'] = df['Price'].astype(str).str.replace(r"[^\d.]", "", regex=True).astype(float)
-            df['Departure Time'] = pd.to_datetime(df['Departure Time'], errors='coerce')
+        try:
+            # Étape 2 : Données de vol extraites, directement en mémoire
+            # (prix déjà en float, heures déjà en datetime)
+            df = flights_df
 
             # Étape 3 : Filtrage par budget
             if max_budget > 0:
                 df = df[df['Price'] <= max_budget]
 
-            # Étape 4 : Filtrage par période de vol
+            # Étape 4 : Filtrage par période de vol (heure de départ déjà calculée)
             if "Matin" in period_choice:
-                df = df[df['Departure Time'].dt.hour < 12]
+                df = df[df['Departure Hour'] < 12]
             elif "Après-midi" in period_choice:
-                df = df[(df['Departure Time'].dt.hour >= 12) & (df['Departure Time'].dt.hour < 18)]
+                df = df[(df['Departure Hour'] >= 12) & (df['Departure Hour'] < 18)]
             else:
-                df = df[df['Departure Time'].dt.hour >= 18]
+                df = df[df['Departure Hour'] >= 18]
 
             # Si aucun vol ne correspond
             if df.empty:
                 st.error("❌ Aucun vol trouvé pour vos critères.")
                 st.stop()
             # Étape 5 : Sélection du meilleur vol (prix puis heure)
-            best_flight = df.sort_values(by=["Price", "Departure Time"]).iloc[0]
+            best_flight = df.nsmallest(1, ["Price", "Departure Time"]).iloc[0]
+
+            # Étape 6 : Réponse construite directement à partir du vol choisi
+            # (heure d'arrivée parfois absente dans le repli DOM : affichée "—")
+            arrival = best_flight['Arrival Time']
+            arrival_time = arrival.strftime('%H:%M') if pd.notna(arrival) else "—"
+            arrival_note = ""
+            if pd.notna(arrival):
+                days_later = (arrival.normalize() - best_flight['Departure Time'].normalize()).days
+                arrival_note = f" (+{days_later} j)" if days_later > 0 else ""
+            summary = f"""
+🛫 **{best_flight['Airline Company']}**
+
+- 🕒 Départ : **{best_flight['Departure Time'].strftime('%H:%M')}** → Arrivée : **{arrival_time}**{arrival_note}
+- ⏱️ Durée : {best_flight['Flight Duration']}
+- ✈️ Escales : {best_flight['Stops']}
+- 💰 Prix : **{best_flight['Price']:.0f} €**
+"""
 
-            # Étape 6 : Préparation de la requête pour l'agent IA
+            # Requête pour le modèle IA (uniquement si l'option est cochée)
             query = f"""
 Vol recommandé :
 - Compagnie : {best_flight['Airline Company']}
 - Départ : {best_flight['Departure Time'].strftime('%H:%M')}
-- Arrivée : {best_flight['Arrival Time']}
+- Arrivée : {arrival_time}{arrival_note}
 - Durée : {best_flight['Flight Duration']}
 - Prix : {best_flight['Price']} €
 - Escales : {best_flight['Stops']}
@@ -129,15 +169,16 @@ Vol recommandé :
         except Exception as e:
             st.error(f"❌ Erreur lors du traitement des données : {e}")
             st.stop()
-        # Étape 7 : Appel de l'agent IA pour générer la réponse finale
-        with st.spinner("🤖 L'IA prépare la réponse..."):
-            response = agent.invoke(query)
-            message = response.get("output", "") if isinstance(response, dict) else response
-            message = html.unescape(message)
-            message = re.sub(r'\\[nrt]', '\n', message)
-
-            st.markdown("### 🧠 Résultat final")
-            st.markdown(
-                f"<pre style='white-space: pre-wrap; color: white; background-color: #1e1e1e; padding: 1rem;'>{message}</pre>",
-                unsafe_allow_html=True
-            )
+        # Étape 7 : Affichage de la réponse finale
+        # Le vol est déjà choisi en Python : par défaut, aucun appel au modèle.
+        st.markdown("### 🧠 Résultat final")
+        st.markdown(summary)
+
+        # Sur demande, rédaction par le modèle rapide, affichée au fil de l'eau
+        if explain:
+            placeholder = st.empty()
+            with st.spinner("🤖 L'IA prépare la réponse..."):
+                message = ""
+                for chunk in describe_flight(query):
+                    message += chunk
+                    show_message(placeholder, message)
@@ -2,10 +2,13 @@
 fichier: flight_recommender.py
 Rôle:
 - Ce fichier définit l’agent IA chargé de recommander des vols.
-- Il charge les données de vols nettoyées depuis `flight_data.csv`.
+- Il travaille sur les vols scrapés en mémoire (ou, à défaut, sur `flight_data.parquet`).
 - Il applique des filtres (escales, budget, période de la journée).
-- Il expose un outil `FlightSearch` utilisable par l’agent IA LangChain.
+- Il expose un outil `FlightSearch` utilisable par l’agent IA LangChain
+  (`build_agent(df)` construit l’agent sur les vols fournis).
 - L’agent IA utilise le modèle `deepseek-ai/DeepSeek-V3` via l’API Together.
+- La simple mise en forme d’un vol déjà choisi passe par un modèle plus petit
+  et plus rapide (`describe_flight`).
 """
 
 
@@ -14,6 +17,8 @@ from langchain_openai import ChatOpenAI
 from langchain.agents import initialize_agent, Tool
 from langchain.agents.agent_types import AgentType
 from datetime import datetime
+from functools import lru_cache, partial
+from typing import Optional
 import re
 import os
 from dotenv import load_dotenv
@@ -21,101 +26,122 @@ from dotenv import load_dotenv
 # Charger les variables d'environnement (.env) → contient la clé API
 load_dotenv()
 
-def load_flight_data():
-    """
-    Charge et nettoie les données de vols à partir du fichier CSV.
+# Nombre maximal de vols renvoyés à l’agent par une recherche
+_MAX_RESULTS = 10
 
-    Étapes :
-    - Lit flight_data.csv dans un DataFrame pandas.
-    - Nettoie la colonne des prix (supprime les symboles, garde les nombres → float).
-    - Corrige les heures d’arrivée et de départ :
-        * Supprime les décalages (+1, +2)
-        * Supprime les espaces insécables
-        * Convertit en objets datetime.time
-    - Ajoute une colonne booléenne "Is_Stopover" indiquant si le vol a une escale.
+# Motifs de détection des critères, compilés une seule fois
+# (appliqués à la requête déjà passée en minuscules)
+_RE_NONSTOP = re.compile(r"\bsans\s+escale\b|\bdirect\b")
+_RE_WITHSTOP = re.compile(r"\bavec\s+escale\b")
+_RE_BUDGET = re.compile(r"(\d+)\s?(tnd|€|euro|usd|dollars?)")
+_RE_MORNING = re.compile(r"\bmatin\b")
+_RE_AFTERNOON = re.compile(r"\b(après-midi|apres-midi|apm)\b")
+_RE_EVENING = re.compile(r"\bsoir\b")
 
-    Returns:
-        pd.DataFrame: tableau nettoyé des vols
+def load_flight_data(path: str = "flight_data.parquet"):
     """
-    df = pd.read_csv("flight_data.csv")
-
-    # Nettoyage prix
-    df["Price"] = df["Price"].astype(str).str.replace(r"[^\d.]", "", regex=True).astype(float)
-
-    # Conversion heures
-    # Supprimer tout ce qui est après un + (exemple 11:20 AM+1 -> 11:20 AM)
-    df["Arrival Time"] = df["Arrival Time"].astype(str).str.replace(r"\+.*$", "", regex=True)
-
-    # Supprimer les espaces insécables
-    df["Arrival Time"] = df["Arrival Time"].str.replace("\u202f", " ")
-
-    # Conversion en datetime puis en heure pure
-    df["Arrival Time"] = pd.to_datetime(df["Arrival Time"], format="%I:%M %p", errors="coerce").dt.time
+    Charge les données de vols à partir du fichier Parquet.
 
-    df["Departure Time"] = df["Departure Time"].astype(str).str.replace(r"\+.*$", "", regex=True)
-    df["Departure Time"] = df["Departure Time"].str.replace("\u202f", " ")
-    df["Departure Time"] = pd.to_datetime(df["Departure Time"], format="%I:%M %p", errors="coerce").dt.time
+    Étapes :
+    - Lit flight_data.parquet dans un DataFrame pandas.
+      Parquet conserve les types écrits par le scraper : les prix sont des
+      nombres, les heures de départ/arrivée des datetime, et les colonnes
+      "Is_Stopover" / "Departure Hour" sont déjà calculées.
 
-    # Escale booléen
-    df["Is_Stopover"] = df["Stops"].str.contains("1 stop", case=False, na=False)
+    Le résultat est mis en cache tant que le fichier n’est pas modifié :
+    les appels successifs de l’agent ne relisent pas le fichier.
+    Le DataFrame renvoyé est partagé, il ne doit pas être modifié en place.
 
-    return df
+    Returns:
+        pd.DataFrame: tableau des vols
 
-def search_flights(query: str):
+    Raises:
+        FileNotFoundError: si le fichier n’existe pas (le scraper ne l’écrit que
+            si `scrape_and_save` est appelé avec `out`).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{path} introuvable : lancez scrape_and_save(..., out=\"{path}\") "
+            "ou passez le DataFrame des vols à build_agent(df)."
+        )
+    return _load_cached(path, os.path.getmtime(path))
+
+@lru_cache(maxsize=1)
+def _load_cached(path: str, mtime: float) -> pd.DataFrame:
+    """Lecture effective du fichier ; `mtime` sert de clé pour invalider le cache après un nouveau scraping."""
+    return pd.read_parquet(path, engine="pyarrow")
+
+def search_flights(query: str, df: Optional[pd.DataFrame] = None):
     """
     Recherche des vols en fonction d’une requête textuelle de l’utilisateur.
 
     Args:
         query (str): La requête utilisateur (ex: "vol sans escale le matin moins de 200 euros")
+        df (pd.DataFrame, optionnel): vols déjà en mémoire ;
+            à défaut, ils sont chargés depuis le fichier Parquet.
 
     Étapes :
-    - Charge les données de vols (load_flight_data()).
+    - Utilise le DataFrame fourni, sinon charge les données de vols (load_flight_data()).
     - Filtre selon les critères détectés dans la requête :
         * Escales : "sans escale" ou "avec escale"
         * Budget : détection d’un montant + unité (€ / TND / USD)
         * Période : matin, après-midi, soir
-    - Trie les résultats par prix puis heure de départ.
+    - Garde les _MAX_RESULTS vols les moins chers (puis les plus tôt) et
+      indique combien de vols correspondaient au total.
     - Retourne une chaîne de texte contenant les résultats formatés.
 
     Returns:
         str: description textuelle des vols trouvés ou message d’erreur.
     """
-    df = load_flight_data()
+    if df is None:
+        df = load_flight_data()
+
+    # Requête en minuscules : les motifs n’ont pas besoin de re.IGNORECASE
+    q = query.lower()
 
     # Filtrage escale
-    if re.search(r"\bsans\s+escale\b|\bdirect\b", query, re.IGNORECASE):
-        df = df[df["Is_Stopover"] == False]
-    elif re.search(r"\bavec\s+escale\b", query, re.IGNORECASE):
-        df = df[df["Is_Stopover"] == True]
+    if _RE_NONSTOP.search(q):
+        df = df[~df["Is_Stopover"]]
+    elif _RE_WITHSTOP.search(q):
+        df = df[df["Is_Stopover"]]
 
     # Filtrage budget
-    budget_match = re.search(r"(\d+)\s?(tnd|€|euro|usd|dollars?)", query, re.IGNORECASE)
+    budget_match = _RE_BUDGET.search(q)
     if budget_match:
         max_budget = float(budget_match.group(1))
         df = df[df["Price"] <= max_budget]
 
-    # Filtrage période
-    if re.search(r"\bmatin\b", query, re.IGNORECASE):
-        df = df[pd.to_datetime(df["Departure Time"].astype(str)).dt.hour < 12]
-    elif re.search(r"\b(après-midi|apres-midi|apm)\b", query, re.IGNORECASE):
-        df = df[(pd.to_datetime(df["Departure Time"].astype(str)).dt.hour >= 12) &
-                (pd.to_datetime(df["Departure Time"].astype(str)).dt.hour < 18)]
-    elif re.search(r"\bsoir\b", query, re.IGNORECASE):
-        df = df[pd.to_datetime(df["Departure Time"].astype(str)).dt.hour >= 18]
+    # Filtrage période (heure de départ déjà calculée par le scraper)
+    if _RE_MORNING.search(q):
+        df = df[df["Departure Hour"] < 12]
+    elif _RE_AFTERNOON.search(q):
+        df = df[(df["Departure Hour"] >= 12) & (df["Departure Hour"] < 18)]
+    elif _RE_EVENING.search(q):
+        df = df[df["Departure Hour"] >= 18]
 
     if df.empty:
         return "❌ Aucun vol trouvé après filtrage."
 
-    df = df.sort_values(by=["Price", "Departure Time"])
+    # Sélection des moins chers (puis plus tôt) sans trier tout le tableau
+    total = len(df)
+    df = df.nsmallest(_MAX_RESULTS, ["Price", "Departure Time"])
     result = df[["Departure Time", "Airline Company", "Stops", "Price", "Flight Duration", "co2 emissions"]]
-    return "✈️ Vols trouvés :\n\n" + result.to_string(index=False)
+    header = f"✈️ Vols trouvés ({len(result)} vols sur {total} affichés, les moins chers) :"
+    return header + "\n\n" + result.to_string(index=False)
 
-# Définition de l’outil "FlightSearch" utilisable par l’agent IA
-flight_tool = Tool(
-    name="FlightSearch",
-    func=search_flights,
-    description="Cherche un vol selon période de la journée (matin, après-midi, soir) + escale + budget."
-)
+def make_flight_tool(df: Optional[pd.DataFrame] = None) -> Tool:
+    """
+    Construit l’outil "FlightSearch" utilisable par l’agent IA.
+
+    Args:
+        df (pd.DataFrame, optionnel): vols en mémoire sur lesquels l’outil travaille.
+            Chaque appel de l’agent réutilise ce DataFrame au lieu de relire le fichier.
+    """
+    return Tool(
+        name="FlightSearch",
+        func=partial(search_flights, df=df),
+        description="Cherche un vol selon période de la journée (matin, après-midi, soir) + escale + budget."
+    )
 
 # Configuration du modèle IA via l’API Together
 llm = ChatOpenAI(
@@ -125,11 +151,51 @@ llm = ChatOpenAI(
     base_url="https://api.together.xyz/v1"
 )
 
-# Initialisation de l’agent IA avec l’outil de recherche de vols
-agent = initialize_agent(
-    tools=[flight_tool],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,   # L’agent raisonne étape par étape sans entraînement spécifique
-    verbose=True,   # Affiche les logs pour debug
-    handle_parsing_errors=True   # Gère les erreurs de parsing automatiquement
+# Modèle rapide pour la mise en forme d’un vol déjà sélectionné :
+# aucun raisonnement n’est nécessaire, un grand modèle n’apporte rien ici
+fast_llm = ChatOpenAI(
+    model=os.getenv("FAST_MODEL", "Qwen/Qwen2.5-7B-Instruct-Turbo"),
+    temperature=0.2,
+    api_key=os.getenv("TOGETHER_API_KEY"),
+    base_url="https://api.together.xyz/v1"
 )
+
+def describe_flight(flight_summary: str):
+    """
+    Rédige une présentation claire d’un vol déjà sélectionné, avec le modèle rapide.
+
+    Args:
+        flight_summary (str): description brute du vol (compagnie, horaires, prix...)
+
+    Yields:
+        str: morceaux de la réponse, au fur et à mesure de leur génération.
+    """
+    prompt = (
+        "Présente ce vol à l’utilisateur de façon claire et concise, en français, "
+        "sans inventer d’information :\n" + flight_summary
+    )
+    for chunk in fast_llm.stream(prompt):
+        yield chunk.content
+
+def warm_up_llm(model: Optional[ChatOpenAI] = None) -> None:
+    """
+    Ouvre à l’avance la connexion HTTPS vers l’API Together (DNS, TLS).
+
+    Appelée pendant le scraping, elle évite de payer l’établissement de la
+    connexion lors du premier appel du modèle (par défaut le modèle rapide).
+    Sans effet en cas d’erreur.
+    """
+    try:
+        (model or fast_llm).root_client.models.list()
+    except Exception as e:
+        print(f"[Agent] Préchauffage de la connexion impossible : {e}")
+
+def build_agent(df: Optional[pd.DataFrame] = None):
+    """Initialise l’agent IA avec l’outil de recherche de vols (sur `df` si fourni)."""
+    return initialize_agent(
+        tools=[make_flight_tool(df)],
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,   # L’agent raisonne étape par étape sans entraînement spécifique
+        verbose=True,   # Affiche les logs pour debug
+        handle_parsing_errors=True   # Gère les erreurs de parsing automatiquement
+    )
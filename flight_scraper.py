@@ -4,20 +4,120 @@ Fichier : flight_scraper.py
 Rôle global :
 ---------------
 Ce fichier permet de générer dynamiquement une URL Google Flights encodée en base64,
-d’ouvrir cette page via Playwright (navigateur automatisé), de collecter les informations
-des vols (heures, prix, durée, compagnie, émissions CO2, etc.) et de les sauvegarder
-dans un fichier CSV.
+de récupérer la page de résultats par une requête HTTP directe (ou via Playwright
+en repli), de collecter les informations des vols (heures, prix, durée, compagnie,
+émissions CO2, etc.) et de les renvoyer sous forme de DataFrame (avec sauvegarde
+Parquet optionnelle, qui conserve les types des colonnes).
 
 Il combine :
 - La génération d’URL (classe FlightURLBuilder).
-- Le scraping automatisé (fonction _scrape).
-- L’extraction de texte ciblé (_text).
-- L’orchestration et la sauvegarde (scrape_and_save).
+- La requête HTTP directe et le décodage des résultats (_scrape_http).
+- Le scraping automatisé de repli (_scrape_browser).
+- L’orchestration et la sauvegarde optionnelle (scrape_and_save).
 """
-import asyncio, csv, base64, pandas as pd
-from playwright.async_api import async_playwright
-from typing import List, Dict
+import asyncio, atexit, csv, base64, re, threading, pandas as pd
+import httpx
+import orjson
+from cachetools import TTLCache
+from typing import List, Dict, Optional
 import os
+import time
+
+# HTTP/2 nécessite le paquet optionnel h2 (httpx[http2]) ; sinon HTTP/1.1
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# En-têtes envoyés par le client HTTP (navigateur desktop, interface en anglais)
+_HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Bloc de données des résultats rendu côté serveur dans la page de recherche
+_DS1_RE = re.compile(r"AF_initDataCallback\(\{key: 'ds:1'.*?data:(\[.*?\]), sideChannel", re.S)
+
+# Colonnes produites par le scraper, quelle que soit la source
+_COLUMNS = [
+    "Departure Time", "Arrival Time", "Airline Company", "Flight Duration",
+    "Stops", "Price", "co2 emissions", "emissions variation",
+    # Colonnes dérivées, calculées une seule fois au scraping
+    "Is_Stopover", "Departure Hour",
+]
+
+# Sélecteurs CSS de chaque champ dans un bloc de vol (repli Playwright)
+_SELECTORS = {
+    "Departure Time": 'span[aria-label*="Departure time"]',
+    "Arrival Time":   'span[aria-label*="Arrival time"]',
+    "Airline Company":".sSHqwe",
+    "Flight Duration":"div.gvkrdb",
+    "Stops":          "div.EfT7Ae span.ogfYpf",
+    "Price":          "div.FpEdX span",
+    "co2 emissions":  "div.O7CXue",
+    "emissions variation": "div.N6PNV",
+}
+
+# Table de remplacement des espaces insécables (Google sépare "5:30" et "AM" par \u202f)
+_SPACES = str.maketrans({"\u202f": " ", "\u00a0": " "})
+
+# Script exécuté dans la page : parcourt les blocs ".pIav2d" et renvoie
+# un tableau d’objets {colonne: texte} construit à partir de _SELECTORS
+_EXTRACT_JS = """
+(selectors) => Array.from(document.querySelectorAll(".pIav2d")).map(f =>
+    Object.fromEntries(Object.entries(selectors).map(
+        ([col, sel]) => [col, f.querySelector(sel)?.innerText ?? ""]
+    ))
+)
+"""
+
+# Client HTTP partagé (pool de connexions persistant) et event loop associé
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Cache des résultats par trajet et date : (dep, dst, date) -> DataFrame
+# En mémoire pendant 15 minutes, et sur disque (un fichier Parquet par recherche)
+_CACHE_TTL = 900
+_CACHE_DIR = "flight_cache"
+_results_cache = TTLCache(maxsize=256, ttl=_CACHE_TTL)
+_results_cache_lock = threading.Lock()
+
+# Formats acceptés en entrée (ils composent aussi le nom des fichiers de cache)
+_IATA_RE = re.compile(r"[A-Z]{3}")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Event loop dédié au scraping, exécuté en continu dans un thread d’arrière-plan :
+# les recherches successives y sont planifiées et réutilisent les mêmes ressources
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# Options de lancement de Chromium (moins de mémoire, pas de marqueur d’automatisation)
+_CHROMIUM_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+]
+
+# Ressources bloquées dans le navigateur de repli. Les feuilles de style sont
+# conservées : innerText dépend du rendu CSS (textes masqués, tooltips...).
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+_TRACKER_RE = re.compile(r"google-analytics\.com|googletagmanager\.com|doubleclick\.net")
+
+# Attente maximale des résultats dans la page (ms), et message affiché
+# par Google Flights lorsqu’aucun vol ne correspond à la recherche
+_WAIT_TIMEOUT = 15_000
+_NO_FLIGHTS_SELECTOR = "text=/No (results|flights) (returned|found)/i"
+
+# Navigateur Playwright partagé (lancé au premier repli, puis réutilisé)
+_playwright = None
+_browser = None
+_context = None
+_browser_lock = asyncio.Lock()
+
 class FlightURLBuilder:
     """Classe utilitaire pour construire une URL Google Flights encodée en base64."""
     @staticmethod
@@ -51,12 +151,126 @@ class FlightURLBuilder:
         # Retourne l’URL Google Flights complète
         return f"https://www.google.com/travel/flights/search?tfs={b64}"
 
-async def _scrape(dep: str, dst: str, date: str) -> List[Dict[str, str]]:
+async def _get_http_client() -> httpx.AsyncClient:
+    """
+    Retourne le client HTTP partagé entre les recherches.
+
+    Le pool de connexions est lié à l’event loop courant (normalement l’event
+    loop d’arrière-plan) : si celui-ci a changé, un nouveau client est construit
+    et l’ancien est fermé.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        old_client, old_loop = _http_client, _http_client_loop
+        _http_client = httpx.AsyncClient(
+            http2=_HTTP2,
+            headers=_HTTP_HEADERS,
+            timeout=20.0,
+            follow_redirects=True,
+        )
+        _http_client_loop = loop
+        if old_client is not None:
+            await _close_http_client(old_client, old_loop)
+    return _http_client
+
+async def _close_http_client(client: httpx.AsyncClient, client_loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Ferme un client HTTP remplacé, sur son propre event loop s’il tourne encore."""
+    if client_loop is not None and client_loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+        return
+    try:
+        await client.aclose()
+    except Exception as e:
+        print(f"[Scraper] Fermeture de l’ancien client HTTP impossible : {e}")
+
+def _at(ymd: list, hm: list) -> pd.Timestamp:
+    """Construit un horodatage à partir de [année, mois, jour] et [heure, minute] (minute omise si nulle)."""
+    hour, minute = (list(hm) + [0, 0])[:2]
+    return pd.Timestamp(*ymd, hour, minute)
+
+def _parse_http_payload(html: str) -> Optional[List[Dict]]:
     """
     Rôle :
     -------
-    Ouvrir une page Google Flights, extraire la liste des vols proposés
-    et renvoyer leurs détails sous forme de dictionnaires.
+    Extraire les vols du bloc `ds:1` rendu côté serveur par Google Flights.
+    Les champs sont typés directement (horodatages, prix en float) :
+    aucun nettoyage de texte n’est nécessaire ensuite.
+
+    Retour :
+    - Liste de dictionnaires (colonnes de _COLUMNS),
+      ou None si la structure de la réponse n’est pas celle attendue.
+      Un vol isolé mal formé est ignoré sans invalider les autres.
+    """
+    match = _DS1_RE.search(html)
+    if not match:
+        return None
+    try:
+        payload = orjson.loads(match.group(1))
+        # [2] : meilleurs vols, [3] : autres vols
+        itineraries = [item for block in (payload[2], payload[3]) if block for item in block[0]]
+    except (orjson.JSONDecodeError, IndexError, KeyError, TypeError):
+        return None
+
+    data = []
+    for item in itineraries:
+        try:
+            data.append(_decode_itinerary(item))
+        except (IndexError, KeyError, TypeError, ValueError):
+            # Vol incomplet (prix ou durée absents...) : ignoré
+            continue
+    return data
+
+def _decode_itinerary(item: list) -> Dict:
+    """Décode un vol du bloc `ds:1` en dictionnaire typé (colonnes de _COLUMNS)."""
+    info, summary = item[0], item[1]
+    stops = len(info[13] or [])
+    minutes = int(info[9])
+    departure = _at(info[4], info[5])
+    return {
+        "Departure Time": departure,
+        "Arrival Time":   _at(info[7], info[8]),
+        "Airline Company":", ".join(info[1]),
+        "Flight Duration":f"{minutes // 60} hr {minutes % 60} min",
+        "Stops":          "Nonstop" if stops == 0 else f"{stops} stop{'s' if stops > 1 else ''}",
+        "Price":          float(summary[0][1]),
+        # Émissions non décodées depuis la réponse HTTP : renseignées par le repli DOM seulement
+        "co2 emissions":  None,
+        "emissions variation": None,
+        "Is_Stopover":    stops > 0,
+        "Departure Hour": departure.hour,
+    }
+
+async def _scrape_http(dep: str, dst: str, date: str) -> Optional[List[Dict]]:
+    """
+    Rôle :
+    -------
+    Récupérer les vols par une simple requête HTTP, sans lancer de navigateur.
+
+    La page de recherche (paramètre `tfs` de FlightURLBuilder) contient déjà
+    les résultats sérialisés : on les lit directement au lieu de rendre le JS.
+
+    Retour :
+    - Liste de dictionnaires, ou None si la requête ou le décodage échoue.
+    """
+    url = FlightURLBuilder.build_url(dep, dst, date)
+    try:
+        client = await _get_http_client()
+        response = await client.get(url)
+        response.raise_for_status()
+    except (httpx.HTTPError, ImportError) as e:
+        # ImportError : client HTTP impossible à construire (dépendance manquante)
+        print(f"[Scraper] Requête HTTP échouée : {e}")
+        return None
+    return _parse_http_payload(response.text)
+
+async def _scrape(dep: str, dst: str, date: str) -> pd.DataFrame:
+    """
+    Rôle :
+    -------
+    Récupérer la liste des vols proposés par Google Flights.
+    Essaie d’abord la requête HTTP directe ; Playwright n’est utilisé qu’en
+    repli, si la réponse ne peut pas être décodée.
 
     Paramètres :
     - dep : aéroport de départ
@@ -64,67 +278,263 @@ async def _scrape(dep: str, dst: str, date: str) -> List[Dict[str, str]]:
     - date : date du vol
 
     Retour :
-    - Liste de dictionnaires contenant les infos de chaque vol.
+    - DataFrame typé (heures en datetime, prix en float), une ligne par vol.
     """
-    # Construction de l’URL dynamique
-    url = FlightURLBuilder.build_url(dep, dst, date)
+    data = await _scrape_http(dep, dst, date)
+    if data:
+        return pd.DataFrame.from_records(data, columns=_COLUMNS)
 
+    print("[Scraper] Réponse HTTP inexploitable, repli sur Playwright.")
+    raw = await _scrape_browser(FlightURLBuilder.build_url(dep, dst, date))
+    return _clean_dom_frame(pd.DataFrame.from_records(raw, columns=_COLUMNS), date)
 
-     # Lancement de Playwright avec un navigateur Chromium en mode headless
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+def _clean_dom_frame(df: pd.DataFrame, date: str) -> pd.DataFrame:
+    """
+    Convertit les textes extraits du DOM vers les mêmes types que la réponse HTTP.
 
-        # Accès à l’URL générée
-        await page.goto(url, timeout=60_000)
+    Étapes :
+    - Nettoie la colonne des prix (supprime les symboles, garde les nombres → float).
+    - Corrige les heures d’arrivée et de départ :
+        * Combine l’heure avec la date du vol (décalage +1, +2 ajouté en jours)
+    - Calcule les colonnes dérivées "Is_Stopover" et "Departure Hour".
+    """
+    # Nettoyage prix : une seule extraction vectorisée du montant
+    # (séparateur de milliers retiré avant : "€1,234" -> 1234.0)
+    price = df["Price"].astype(str).str.replace(",", "", regex=False)
+    df["Price"] = pd.to_numeric(price.str.extract(r"(\d+(?:\.\d+)?)", expand=False), errors="coerce")
 
-        # Attente que les résultats de vols apparaissent (élément ".pIav2d")
-        await page.wait_for_selector(".pIav2d")
-        # Récupération de tous les vols
-        flights = await page.query_selector_all(".pIav2d")
+    for col in ("Departure Time", "Arrival Time"):
+        # Séparation littérale sur le + (exemple 11:20 AM+1 -> "11:20 AM", décalage 1 jour)
+        parts = df[col].astype(str).str.split("+", n=1)
+        offset = pd.to_numeric(parts.str[1], errors="coerce").fillna(0).astype(int)
+        df[col] = pd.to_datetime(date + " " + parts.str[0], format="%Y-%m-%d %I:%M %p", errors="coerce")
+        df[col] += pd.to_timedelta(offset, unit="D")
 
-        data = []
-        # Extraction des infos principales de chaque vo
-        for f in flights:
-            data.append({
-                "Departure Time": await _text(f, 'span[aria-label*="Departure time"]'),
-                "Arrival Time":   await _text(f, 'span[aria-label*="Arrival time"]'),
-                "Airline Company":await _text(f, ".sSHqwe"),
-                "Flight Duration":await _text(f, "div.gvkrdb"),
-                "Stops":          await _text(f, "div.EfT7Ae span.ogfYpf"),
-                "Price":          await _text(f, "div.FpEdX span"),
-                "co2 emissions":  await _text(f, "div.O7CXue"),
-                "emissions variation": await _text(f, "div.N6PNV"),
-            })
+    # Escale booléen ("1 stop", "2 stops"... ; "Nonstop" sinon) et heure de départ
+    df["Is_Stopover"] = df["Stops"].str.contains(r"\d+\s+stop", case=False, na=False)
+    df["Departure Hour"] = df["Departure Time"].dt.hour
 
-        # Fermeture du navigateur
-        await browser.close()
-        return data
+    return df
 
-async def _text(el, sel):
-    node = await el.query_selector(sel)
-    return await node.inner_text() if node else ""
+async def _scrape_browser(url: str) -> List[Dict[str, str]]:
+    """
+    Rôle :
+    -------
+    Ouvrir une page Google Flights, extraire la liste des vols proposés
+    et renvoyer leurs détails sous forme de dictionnaires.
 
+    Paramètres :
+    - url : URL de recherche générée par FlightURLBuilder
 
+    Retour :
+    - Liste de dictionnaires contenant les infos de chaque vol.
+    """
+    context = await _get_browser_context()
+    page = await context.new_page()
+    try:
+        # Accès à l’URL générée
+        # (sans attendre l’événement "load" : le sélecteur ci-dessous suffit)
+        await page.goto(url, timeout=60_000, wait_until="domcontentloaded")
+
+        # Attente que les résultats de vols apparaissent (élément ".pIav2d"),
+        # ou arrêt immédiat si la page indique qu’aucun vol n’est disponible
+        # (TimeoutError si rien n’apparaît : propagée jusqu’à l’appelant)
+        if not await _wait_for_results(page):
+            return []
+        # Extraction des infos de tous les vols en un seul aller-retour avec le navigateur
+        data = await page.evaluate(_EXTRACT_JS, _SELECTORS)
+        # Espaces insécables remplacés une seule fois, à la source
+        return [{col: text.translate(_SPACES) for col, text in row.items()} for row in data]
+    finally:
+        # Seule la page est fermée : le navigateur reste ouvert pour la recherche suivante
+        await page.close()
+
+async def _wait_for_results(page) -> bool:
+    """
+    Attend, au plus _WAIT_TIMEOUT ms, soit la liste des vols, soit le message
+    "aucun résultat" : la première des deux attentes qui aboutit l’emporte.
+
+    Retour :
+    - True si des vols sont affichés, False si la page indique qu’aucun vol n’existe.
+
+    Lève TimeoutError si aucune des deux n’apparaît à temps (scraping en échec,
+    à ne pas confondre avec une recherche sans résultat).
+    """
+    waits = {
+        asyncio.create_task(page.wait_for_selector(selector, timeout=_WAIT_TIMEOUT, state="attached")): found
+        for selector, found in ((".pIav2d", True), (_NO_FLIGHTS_SELECTOR, False))
+    }
+    pending = set(waits)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if not waits[task]:
+                        print("[Scraper] Aucun vol disponible pour cette recherche.")
+                    return waits[task]
+        raise TimeoutError(f"Aucun résultat affiché après {_WAIT_TIMEOUT // 1000} s")
+    finally:
+        for task in pending:
+            task.cancel()
 
-def scrape_and_save(dep: str, dst: str, date: str, out: str = "flight_data.csv"):
+async def _get_browser_context():
     """
-    Fonction synchrone pour scrapper les vols et sauvegarder dans un CSV.
-    Compatible Streamlit (threads sans event loop).
+    Retourne le contexte Playwright partagé, en lançant Chromium au premier appel
+    (ou si le navigateur a été déconnecté).
     """
+    global _playwright, _browser, _context
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            # Import local : Playwright n’est chargé que si le repli est nécessaire
+            from playwright.async_api import async_playwright
+
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            # Lancement d’un navigateur Chromium en mode headless, allégé
+            _browser = await _playwright.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+            _context = await _browser.new_context()
+            # Les ressources inutiles au scraping ne sont pas téléchargées
+            await _context.route("**/*", _block_resources)
+    return _context
 
-    if os.path.exists(out):
-        print(f"[Scraper] Le fichier {out} existe déjà, chargement depuis le CSV.")
+async def _block_resources(route):
+    """Annule les requêtes d’images, polices, médias et traceurs ; laisse passer le reste."""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or _TRACKER_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _close_browser():
+    """Ferme le navigateur partagé et arrête Playwright."""
+    global _playwright, _browser, _context
+    if _browser is not None:
+        await _browser.close()
+    if _playwright is not None:
+        await _playwright.stop()
+    _playwright = _browser = _context = None
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Retourne l’event loop d’arrière-plan, en démarrant son thread au premier appel."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="flight-scraper", daemon=True).start()
+    return _loop
+
+def _run(coro):
+    """Exécute `coro` sur l’event loop d’arrière-plan et attend son résultat (appel synchrone)."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+async def _close_resources():
+    """Ferme le navigateur partagé et le client HTTP de l’event loop d’arrière-plan."""
+    global _http_client, _http_client_loop
+    await _close_browser()
+    if _http_client is not None and _http_client_loop is asyncio.get_running_loop():
+        await _http_client.aclose()
+        _http_client = _http_client_loop = None
+
+@atexit.register
+def _shutdown():
+    """Libère les ressources partagées à la fin du processus, sans bloquer ni échouer."""
+    if _loop is None:
         return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_resources(), _loop).result(timeout=10)
+    except Exception as e:
+        print(f"[Scraper] Fermeture des ressources à l’arrêt impossible : {e!r}")
 
-    # Création manuelle d'un event loop pour le thread courant
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+
+
+def _cache_path(dep: str, dst: str, date: str) -> str:
+    """Chemin du fichier Parquet de cache pour une recherche."""
+    return os.path.join(_CACHE_DIR, f"flights_{dep}_{dst}_{date}.parquet")
+
+def _load_cached_results(dep: str, dst: str, date: str) -> Optional[pd.DataFrame]:
+    """Retourne les vols déjà scrapés pour cette recherche (mémoire puis disque), ou None."""
+    key = (dep, dst, date)
+    with _results_cache_lock:
+        if key in _results_cache:
+            return _results_cache[key]
+
+    path = _cache_path(dep, dst, date)
+    if not os.path.exists(path):
+        return None
+    if time.time() - os.path.getmtime(path) >= _CACHE_TTL:
+        # Fichier expiré : supprimé pour ne pas accumuler les anciennes recherches
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"[Scraper] Suppression du cache expiré {path} impossible : {e}")
+        return None
     try:
-        data = loop.run_until_complete(_scrape(dep, dst, date))
-    finally:
-        loop.close()
+        df = pd.read_parquet(path, engine="pyarrow")
+    except (OSError, ValueError) as e:
+        # Fichier illisible : ignoré, la recherche sera relancée
+        print(f"[Scraper] Cache {path} illisible : {e}")
+        return None
+    with _results_cache_lock:
+        _results_cache[key] = df
+    return df
+
+def _store_cached_results(dep: str, dst: str, date: str, df: pd.DataFrame) -> None:
+    """
+    Enregistre les vols scrapés en mémoire et sur disque.
+    Le cache disque est facultatif : une erreur d’écriture est signalée sans
+    faire échouer la recherche.
+    """
+    with _results_cache_lock:
+        _results_cache[(dep, dst, date)] = df
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        _write_parquet(df, _cache_path(dep, dst, date))
+    except (OSError, ValueError) as e:
+        print(f"[Scraper] Écriture du cache impossible : {e}")
+
+def _write_parquet(df: pd.DataFrame, path: str) -> None:
+    """Écrit `df` en Parquet (pyarrow, compression zstd)."""
+    df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+
+def scrape_and_save(dep: str, dst: str, date: str, out: Optional[str] = None) -> pd.DataFrame:
+    """
+    Fonction synchrone pour scrapper les vols.
+    Compatible Streamlit (threads sans event loop) : le scraping est planifié
+    sur l’event loop d’arrière-plan partagé par toutes les recherches.
+
+    Les résultats sont mis en cache par (départ, destination, date) pendant
+    15 minutes : une recherche identique ne relance pas le scraping.
+
+    Retourne le DataFrame typé directement en mémoire (partagé avec le cache,
+    à ne pas modifier en place) ; un fichier Parquet n’est écrit que si `out`
+    est fourni (utile pour le debug ou pour load_flight_data).
+
+    Lève ValueError si les aéroports ne sont pas des codes IATA (3 lettres)
+    ou si la date n’est pas au format YYYY-MM-DD, et TimeoutError si la page
+    de résultats ne s’est pas affichée à temps.
+    """
+    dep, dst = dep.strip().upper(), dst.strip().upper()
+    for code in (dep, dst):
+        if not _IATA_RE.fullmatch(code):
+            raise ValueError(f"Code aéroport invalide : {code!r} (3 lettres IATA attendues, ex: TUN)")
+    if not _DATE_RE.fullmatch(date):
+        raise ValueError(f"Date invalide : {date!r} (format YYYY-MM-DD attendu)")
+
+    df = _load_cached_results(dep, dst, date)
+    if df is not None:
+        print(f"[Scraper] {len(df)} vols {dep} → {dst} ({date}) chargés depuis le cache")
+    else:
+        df = _run(_scrape(dep, dst, date))
+        print(f"[Scraper] {len(df)} vols récupérés")
+        # Une recherche sans résultat n’est pas mise en cache (échec possible du scraping)
+        if not df.empty:
+            _store_cached_results(dep, dst, date, df)
+
+    # Sauvegarde Parquet optionnelle (types conservés : datetime, float)
+    if out:
+        out = out.replace(".csv", ".parquet")
+        _write_parquet(df, out)
+        print(f"[Scraper] Vols sauvegardés dans {out}")
 
-    # Sauvegarde CSV
-    pd.DataFrame(data).to_csv(out, index=False, encoding="utf-8")
-    print(f"[Scraper] {len(data)} vols sauvegardés dans {out}")
\ No newline at end of file
+    return df
@@ -12,17 +12,21 @@ Rôle:
 """
 
 import asyncio
-import csv
 import os
 import base64
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 from typing import List, Dict, Optional
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Caractères parasites à remplacer dans les textes extraits (motif, remplacement)
+_CLEANUP = (('Â', ''), ('\u202f', ' '), ('Ã', ''), ('¶', ''))
+
 class FlightURLBuilder:
     """Classe utilitaire pour construire une URL Google Flights encodée en base64."""
 
@@ -140,34 +144,26 @@ async def scrape_flight_info(flight) -> Dict[str, str]:
         "emissions variation": emissions_variation
     }
 
-def clean_csv(filename: str):
-    """Nettoyer les caractères indésirables du CSV (Â, espaces spéciaux, etc.)."""
-    data = pd.read_csv(filename, encoding="utf-8")
-    
-    def clean_text(value):
-        if isinstance(value, str):
-            return value.replace('Â', '').replace(' ', ' ').replace('Ã', '').replace('¶', '').strip()
-        return value
-
-    cleaned_data = data.applymap(clean_text)
-    cleaned_file_path = f"{filename}"
-    cleaned_data.to_csv(cleaned_file_path, index=False)
-    print(f"Cleaned CSV saved to: {cleaned_file_path}")
+def clean_table(table: pa.Table) -> pa.Table:
+    """Nettoyer les caractères indésirables (Â, espaces spéciaux, etc.) des colonnes texte."""
+    # Nettoyage des colonnes texte avec les noyaux de calcul Arrow
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type):
+            for pattern, replacement in _CLEANUP:
+                column = pc.replace_substring(column, pattern, replacement)
+            column = pc.utf8_trim_whitespace(column)
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
 
 def save_to_csv(data: List[Dict[str, str]], filename: str = "flight_data_proxy.csv") -> None:
-    """Sauvegarder la liste de vols dans un fichier CSV et nettoyer ensuite."""
+    """Nettoyer la liste de vols en mémoire puis l’écrire en une seule fois dans un fichier CSV."""
     if not data:
         return
-    
-    headers = list(data[0].keys())
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(data)
-    
-    
-    clean_csv(filename)
+
+    table = clean_table(pa.Table.from_pylist(data))
+    pa_csv.write_csv(table, filename)
+    print(f"Cleaned CSV saved to: {filename}")
 
 async def scrape_flight_data(one_way_url):
     """Scraper tous les vols depuis une URL Google Flights et sauvegarder en CSV."""